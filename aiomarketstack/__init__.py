@@ -20,24 +20,34 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import json
 import warnings
-from datetime import date, datetime, timezone
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
 from enum import IntEnum
 from typing import (
     TYPE_CHECKING,
+    Any,
     AsyncGenerator,
     Callable,
+    ClassVar,
     Collection,
+    Generator,
+    Iterable,
     Literal,
 )
 
 import aiohttp
 import structlog
 from aiohttp import ClientResponse, ClientSession
+from yarl import URL
 
 if TYPE_CHECKING:
     from typing_extensions import Self
 
+from aiomarketstack._cache import EodCache, FileCache
 from aiomarketstack.exceptions import (
     ForbiddenError,
     FunctionAccessRestrictedError,
@@ -58,11 +68,40 @@ from aiomarketstack.exceptions import (
 )
 
 if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+
     from .types import Eod, EodResponse, RawEod, Response
 
+__all__ = [
+    "EodCache",
+    "FileCache",
+    "HttpMarketstackClient",
+    "HttpsMarketstackClient",
+    "MarketstackPlan",
+]
+
 HTTP_BASE_URL = "http://api.marketstack.com/v1/eod"
 HTTPS_BASE_URL = "https://api.marketstack.com/v1/eod"
 
+# Marketstack returns at most 100 rows per /eod/{date} page by default.
+_MAX_SYMBOLS_PER_QUERY = 100
+
+
+# orjson is considerably faster at parsing large pages, but is optional.
+_loads: Callable[[bytes], Any]
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover
+    _loads = json.loads
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_date(d: date) -> str:
+    return d.isoformat()
+
 
 class MarketstackPlan(IntEnum):
     """The type of the marketstack plan."""
@@ -74,11 +113,48 @@ class MarketstackPlan(IntEnum):
 
 
 class _MarketstackClient:
-    def __init__(
+    _ERR_TABLE: ClassVar[
+        dict[Literal["default"] | int, dict[str, type[ResponseError]]]
+    ] = {
+        401: {
+            "invalid_access_key": InvalidAccessKeyError,
+            "missing_access_key": MissingAccessKeyError,
+            "inactive_user": InactiveUserError,
+            "default": UnauthorizedError,
+        },
+        403: {
+            "https_access_restricted": HttpsAccessRestrictedError,
+            "function_access_restricted": FunctionAccessRestrictedError,
+            "default": ForbiddenError,
+        },
+        404: {
+            "invalid_api_function": InvalidApiFunctionError,
+            "404_not_found": ResourceNotFoundError,
+            "default": NotFoundError,
+        },
+        429: {
+            "usage_limit_reached": UsageLimitReachedError,
+            "rate_limit_reached": RateLimitReachedError,
+            "default": TooManyRequestsError,
+        },
+        500: {
+            "default": InternalErrorError,
+        },
+        "default": {
+            "default": UnhandledResponseError,
+        },
+    }
+
+    def __init__(  # noqa: PLR0913
         self: Self,
         base_url: str,
         access_key: str,
         plan: MarketstackPlan = MarketstackPlan.BASIC,
+        conn_limit: int = 256,
+        conn_per_host: int = 16,
+        timeout: float = 30,
+        cache: EodCache | None = None,
+        max_concurrent_pages: int = 8,
     ) -> None:
         """Initialize the MarketstackClient.
 
@@ -89,9 +165,31 @@ class _MarketstackClient:
             over_tls: Whether to use https or http for requests. Must
                 match the permission level of your token.
             base_url: The base url of the API, stripped of the protocol.
+            conn_limit: The maximum number of simultaneous connections.
+            conn_per_host: The maximum number of simultaneous connections to the
+                marketstack host.
+            timeout: The total timeout of a single request, in seconds. This includes
+                the time spent waiting for a free connection.
+            cache: An optional persistent cache for historical EOD data.
+            max_concurrent_pages: The maximum number of requests of a single query
+                (pages of a range, or dates of a batch) to make concurrently.
         """
         self.base_url = base_url
         self.plan = plan
+        self._conn_limit = conn_limit
+        self._conn_per_host = conn_per_host
+        self._timeout = timeout
+        self._cache = cache
+        if max_concurrent_pages < 1:
+            err_msg = "max_concurrent_pages must be at least 1."
+            raise ValueError(err_msg)
+        # Never run more requests than connections are available, as queued ones
+        # count towards the timeout while they wait for a connection.
+        self._max_concurrent_requests = min(
+            limit
+            for limit in (max_concurrent_pages, conn_per_host, conn_limit)
+            if limit > 0
+        )
         self._client_session: ClientSession | None = None
         self._access_key = access_key
         self._log: structlog.stdlib.BoundLogger = structlog.get_logger()
@@ -123,27 +221,106 @@ class _MarketstackClient:
                 )
             )
 
-        async with self._session as sess:
-            url = f"{self.base_url}/{self._format_date(transaction_date)}"
-            params = {
-                "access_key": self._access_key,
-                "symbols": ",".join(symbols),
-                **({} if exchange_filter is None else {"exchange": exchange_filter}),
-            }
-            log = self._log.bind(url=url, params=params)
+        raw_eods = await self._get_eod_for_date(
+            symbols, transaction_date, exchange_filter,
+        )
+        if (act_len := len(raw_eods)) != 1:
+            self._log.error(
+                "Length of the response data is not 1",
+                actual_length=act_len,
+                symbols=symbols,
+                transaction_date=transaction_date,
+            )
+
+        return tuple(self._deserialize_eod(raw_eod) for raw_eod in raw_eods)
 
-            async with sess.get(url, params=params) as resp:
-                body: EodResponse = await resp.json()
-                log = log.bind(body=body, status_code=resp.status)
-                log.debug("Finished Query.")
+    async def get_eod_batch(
+        self: Self,
+        requests: Collection[tuple[str, date]],
+        exchange_filter: str | None = None,
+    ) -> dict[tuple[str, date], Eod]:
+        """Query the EOD data for many (symbol, date) pairs.
+
+        Symbols sharing a date are grouped into a single query, so only one request
+        is made per distinct date and every 100 symbols.
+
+        Args:
+        ----
+            requests: The (symbol, date) pairs to search.
+            exchange_filter: The exchange MIC to filter by.
+
+        Returns:
+        -------
+            A mapping of each found (symbol, date) pair, as requested, to its EOD
+            data. Symbols are matched case-insensitively. Pairs for which
+            marketstack returned no data are omitted.
+        """
+        # Keyed by the upper-cased symbol, as marketstack may spell it differently
+        # than requested.
+        symbols_by_date: defaultdict[date, dict[str, list[str]]] = defaultdict(dict)
+        for symbol, transaction_date in requests:
+            symbols_by_date[transaction_date].setdefault(symbol.upper(), []).append(
+                symbol,
+            )
+
+        queries: list[tuple[date, list[str]]] = []
+        for transaction_date, by_symbol in symbols_by_date.items():
+            symbols = list(by_symbol)
+            queries.extend(
+                (transaction_date, symbols[i:i + _MAX_SYMBOLS_PER_QUERY])
+                for i in range(0, len(symbols), _MAX_SYMBOLS_PER_QUERY)
+            )
+        # Bounded, so that queued requests do not time out waiting for a connection.
+        semaphore = asyncio.Semaphore(self._max_concurrent_requests)
+
+        async def get_date(transaction_date: date, symbols: list[str]) -> list[RawEod]:
+            async with semaphore:
+                return await self._get_eod_for_date(
+                    symbols, transaction_date, exchange_filter,
+                )
+
+        results = await asyncio.gather(*(
+            get_date(transaction_date, symbols)
+            for transaction_date, symbols in queries
+        ))
+
+        eods: dict[tuple[str, date], Eod] = {}
+        for (transaction_date, _), raw_eods in zip(queries, results):
+            for raw_eod in raw_eods:
+                eod = self._deserialize_eod(raw_eod)
+                for symbol in symbols_by_date[transaction_date].get(
+                    raw_eod["symbol"].upper(), (),
+                ):
+                    eods[(symbol, transaction_date)] = eod
+        return eods
+
+    async def _get_eod_for_date(
+        self: Self,
+        symbols: Collection[str],
+        transaction_date: date,
+        exchange_filter: str | None,
+    ) -> list[RawEod]:
+        """Query the raw EOD data of at most _MAX_SYMBOLS_PER_QUERY symbols."""
+        if self.plan < MarketstackPlan.BASIC:
+            return [
+                d
+                async for d in self._get_eod_range_helper(
+                    symbols, (transaction_date, transaction_date), exchange_filter,
+                )
+            ]
 
-                await self._handle_if_error(resp, body, log)
-                if (act_len := len(body["data"])) != 1:
-                    log.error(
-                        "Length of the response data is not 1", actual_length=act_len,
-                    )
+        url = f"{self.base_url}/{_format_date(transaction_date)}"
+        params = {
+            "access_key": self._access_key,
+            "symbols": ",".join(symbols),
+            "limit": str(_MAX_SYMBOLS_PER_QUERY),
+        }
+        if exchange_filter is not None:
+            params["exchange"] = exchange_filter
+        log = self._log.bind(url=url, params=params)
 
-                return tuple(self._deserialize_eod(raw_eod) for raw_eod in body["data"])
+        body = await self._get_eod_page(self._session, URL(url).with_query(params), log)
+        return body["data"]
 
     async def get_eod_range(
         self: Self,
@@ -169,6 +346,9 @@ class _MarketstackClient:
         early with partial data, preventing making more than the given number of
         requests.
         """
+        # tuple() cannot consume an async iterator directly, so a single list is
+        # built straight from the raw rows, bypassing iter_eod_range's extra
+        # generator hop per row.
         return tuple([
             self._deserialize_eod(d)
             async for d in self._get_eod_range_helper(
@@ -176,6 +356,67 @@ class _MarketstackClient:
             )
         ])
 
+    async def iter_eod_range(
+        self: Self,
+        symbols: Collection[str],
+        date_range: tuple[date, date],
+        exchange_filter: str | None = None,
+        max_requests: int = 10,
+    ) -> AsyncGenerator[Eod, None]:
+        """Stream the EOD data for the given date range.
+
+        Behaves like :meth:`get_eod_range`, but yields each EOD value as soon as the
+        page containing it is received, rather than buffering the whole range.
+
+        Args:
+        ----
+            symbols: The symbols to search.
+            date_range: The range of dates to search between.
+            exchange_filter: The exchange MIC to filter by.
+            max_requests: The maximum number of requests to make.
+
+        Yields:
+        ------
+            The EOD values for the given date range, left-inclusive.
+        """
+        async for raw_eod in self._get_eod_range_helper(
+            symbols, date_range, exchange_filter, max_requests,
+        ):
+            yield self._deserialize_eod(raw_eod)
+
+    async def get_eod_range_array(
+        self: Self,
+        symbols: Collection[str],
+        date_range: tuple[date, date],
+        exchange_filter: str | None = None,
+        max_requests: int = 10,
+    ) -> npt.NDArray[np.void]:
+        """Query the EOD data for the given date range as a numpy structured array.
+
+        This is the preferred API for analytics over large ranges, as rows are
+        converted in bulk rather than into one dictionary each. Requires numpy.
+
+        Args:
+        ----
+            symbols: The symbols to search.
+            date_range: The range of dates to search between.
+            exchange_filter: The exchange MIC to filter by.
+            max_requests: The maximum number of requests to make.
+
+        Returns:
+        -------
+            A structured array with the fields of :class:`Eod`, with the dates as
+            ``datetime64[D]``. See ``aiomarketstack._array.eod_dtype``.
+        """
+        from aiomarketstack._array import to_structured
+
+        return to_structured([
+            d
+            async for d in self._get_eod_range_helper(
+                symbols, date_range, exchange_filter, max_requests,
+            )
+        ])
+
     async def _get_eod_range_helper(
         self: Self,
         symbols: Collection[str],
@@ -184,103 +425,228 @@ class _MarketstackClient:
         max_requests: int = 10,
     ) -> AsyncGenerator[RawEod, None]:
         """Get the EOD range, returning a generator of bodies."""
-        async with self._session as sess:
-            url = self.base_url
-            params = {
-                "access_key": self._access_key,
-                "symbols": ",".join(symbols),
-                "date_from": self._format_date(date_range[0]),
-                "date_to": self._format_date(date_range[1]),
-                "limit": "1000",
-                **({} if exchange_filter is None else {"exchange": exchange_filter}),
-            }
-            log = self._log.bind(url=url, params=params)
-
-            for _ in range(max_requests):
-                async with sess.get(url, params=params) as resp:
-                    body: EodResponse = await resp.json()
-                    log = log.bind(body=body, status_code=resp.status)
-                    log.debug("Finished Query.")
-
-                    await self._handle_if_error(resp, body, log)
-
-                for d in body["data"]:
-                    yield d
-
-                total_so_far = (p := body["pagination"])["limit"] * p["offset"] + p[
-                    "count"
-                ]
-                if total_so_far == body["pagination"]["total"]:
-                    break
+        if self._cache is not None:
+            async for d in self._get_cached_eod_range_helper(
+                self._cache, symbols, date_range, exchange_filter, max_requests,
+            ):
+                yield d
+            return
+
+        async for body in self._get_eod_range_pages(
+            symbols, date_range, exchange_filter, max_requests,
+        ):
+            for d in body["data"]:
+                yield d
+
+    async def _get_cached_eod_range_helper(  # noqa: PLR0913
+        self: Self,
+        cache: EodCache,
+        symbols: Collection[str],
+        date_range: tuple[date, date],
+        exchange_filter: str | None,
+        max_requests: int,
+    ) -> AsyncGenerator[RawEod, None]:
+        """Get the EOD range, serving the days cached for every symbol from cache.
+
+        Only the span between the first and the last uncached day is queried. Rows
+        are yielded in marketstack's order, i.e. the most recent day first.
+        """
+        cached = {symbol: cache.load(exchange_filter, symbol) for symbol in symbols}
+        days = [
+            date_range[0] + timedelta(days=n)
+            for n in range((date_range[1] - date_range[0]).days + 1)
+        ]
+        uncached_days = [
+            day for day in days if any(day not in cached[s] for s in symbols)
+        ]
+
+        def cached_eods(days: Iterable[date]) -> Generator[RawEod, None, None]:
+            return (
+                eod
+                for day in days
+                for s in symbols
+                if (eod := cached[s][day]) is not None
+            )
+
+        if not uncached_days:
+            for d in cached_eods(reversed(days)):
+                yield d
+            return
+
+        fetch_from, fetch_to = uncached_days[0], uncached_days[-1]
+        for d in cached_eods(day for day in reversed(days) if day > fetch_to):
+            yield d
+
+        fetched: defaultdict[str, dict[date, RawEod]] = defaultdict(dict)
+        total_count, fetched_count = None, 0
+        async for body in self._get_eod_range_pages(
+            symbols, (fetch_from, fetch_to), exchange_filter, max_requests,
+        ):
+            total_count = body["pagination"]["total"]
+            fetched_count += len(body["data"])
+            for d in body["data"]:
+                fetched[d["symbol"]][self._parse_marketstack_date(d["date"])] = d
+                yield d
+
+        # Only complete responses can tell which days have no data. Days close to
+        # today may still be updated by marketstack, so they are never cached.
+        if fetched_count == total_count:
+            immutable_before = datetime.now(tz=timezone.utc).date() - timedelta(days=1)
+            fetched_days = [
+                day for day in days
+                if fetch_from <= day <= fetch_to and day < immutable_before
+            ]
+            # Symbols missing from the response entirely (e.g. due to a different
+            # spelling) cannot be told apart from days without data.
+            for symbol in (s for s in symbols if s in fetched):
+                cache.store(exchange_filter, symbol, {
+                    day: fetched[symbol].get(day) for day in fetched_days
+                })
+
+        for d in cached_eods(day for day in reversed(days) if day < fetch_from):
+            yield d
+
+    async def _get_eod_range_pages(
+        self: Self,
+        symbols: Collection[str],
+        date_range: tuple[date, date],
+        exchange_filter: str | None,
+        max_requests: int = 10,
+    ) -> AsyncGenerator[EodResponse, None]:
+        """Query the EOD range, returning a generator of response pages."""
+        sess = self._session
+        url = self.base_url
+        symbols_str = ",".join(symbols)
+        params = {
+            "access_key": self._access_key,
+            "symbols": symbols_str,
+            "date_from": _format_date(date_range[0]),
+            "date_to": _format_date(date_range[1]),
+            "limit": "1000",
+        }
+        if exchange_filter is not None:
+            params["exchange"] = exchange_filter
+        log = self._log.bind(url=url, params=params)
+        # Encode the query once; each page only differs in its offset.
+        base_url = URL(url).with_query(params)
+
+        if max_requests < 1:
+            return
+
+        # The first page tells us how many rows there are in total. Once that is
+        # known, all the remaining offsets are too, so they can be fetched at once.
+        body = await self._get_eod_page(sess, base_url, log)
+        yield body
+
+        pagination = body["pagination"]
+        fetched_so_far = pagination["offset"] + pagination["count"]
+        if fetched_so_far >= pagination["total"]:
+            return
+
+        all_offsets = range(fetched_so_far, pagination["total"], pagination["limit"])
+        offsets = all_offsets[:max_requests - 1]
+        if len(offsets) < len(all_offsets):
+            log.warning(
+                "Reached max_requests, returning partial data.",
+                max_requests=max_requests,
+                total=pagination["total"],
+            )
+
+        # Bounded, so that a large range cannot occupy the whole connection pool.
+        semaphore = asyncio.Semaphore(self._max_concurrent_requests)
+
+        async def get_page(offset: int) -> EodResponse:
+            async with semaphore:
+                return await self._get_eod_page(
+                    sess, base_url.update_query(offset=str(offset)), log,
+                )
+
+        tasks = [asyncio.ensure_future(get_page(offset)) for offset in offsets]
+        try:
+            # Pages are yielded in order as soon as they arrive, while the later
+            # ones are still being fetched.
+            for task in tasks:
+                yield await task
+        finally:
+            # Like asyncio.TaskGroup (which needs Python 3.11), stop the remaining
+            # pages if one fails or the caller stops iterating, and retrieve their
+            # exceptions.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _get_eod_page(
+        self: Self,
+        sess: ClientSession,
+        url: URL,
+        log: structlog.stdlib.BoundLogger,
+    ) -> EodResponse:
+        """Fetch a single page of the /eod endpoint."""
+        async with sess.get(url) as resp:
+            await self._handle_if_error(resp, log)
+
+            body: EodResponse = _loads(await resp.read())
+            log.debug("Finished Query.", body=body, status_code=resp.status)
+
+        return body
 
     async def __aenter__(self: Self) -> Self:
         """Start the HTTP session."""
-        self._client_session = aiohttp.ClientSession()
+        connector = aiohttp.TCPConnector(
+            limit=self._conn_limit,
+            limit_per_host=self._conn_per_host,
+            ttl_dns_cache=300,
+        )
+        self._client_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self._timeout),
+        )
         return self
 
     async def __aexit__(self: Self, *_: object) -> None:
         """Close the HTTP session."""
         await self._session.close()
+        self._client_session = None
 
     async def _handle_if_error(
         self: Self,
         resp: ClientResponse,
-        body: Response,
         log: structlog.stdlib.BoundLogger,
     ) -> None:
         http_code_ok = 200
         if resp.status == http_code_ok:
             return
 
-        err_map: dict[
-            Literal["default"] | int,
-            dict[str, Callable[[], ResponseError]],
-        ] = {
-            401: {
-                "invalid_access_key": lambda: InvalidAccessKeyError(resp),
-                "missing_access_key": lambda: MissingAccessKeyError(resp),
-                "inactive_user": lambda: InactiveUserError(resp),
-                "default": lambda: UnauthorizedError(resp),
-            },
-            403: {
-                "https_access_restricted": lambda: HttpsAccessRestrictedError(resp),
-                "function_access_restricted":
-                    lambda: FunctionAccessRestrictedError(resp),
-                "default": lambda: ForbiddenError(resp),
-            },
-            404: {
-                "invalid_api_function": lambda: InvalidApiFunctionError(resp),
-                "404_not_found": lambda: ResourceNotFoundError(resp),
-                "default": lambda: NotFoundError(resp),
-            },
-            429: {
-                "usage_limit_reached": lambda: UsageLimitReachedError(resp),
-                "rate_limit_reached": lambda: RateLimitReachedError(resp),
-                "default": lambda: TooManyRequestsError(resp),
-            },
-            500: {
-                "default": lambda: InternalErrorError(resp),
-            },
-            "default": {
-                "default": lambda: UnhandledResponseError(resp),
-            },
-        }
-
-        log.warning("Unsuccessful response.")
-
-        if resp.status not in err_map:
-            default_exc = err_map["default"]["default"]()
+        # Error bodies are only parsed when needed. They are not guaranteed to be
+        # JSON, e.g. when a proxy in front of marketstack answers instead.
+        raw_body = await resp.read()
+        try:
+            body: Response | None = _loads(raw_body)
+        except ValueError:
+            body = None
+
+        log.warning(
+            "Unsuccessful response.",
+            body=raw_body if body is None else body,
+            status_code=resp.status,
+        )
+
+        if resp.status not in self._ERR_TABLE:
+            default_exc = self._ERR_TABLE["default"]["default"](resp)
             raise default_exc
 
+        if body is None:
+            raise self._ERR_TABLE[resp.status]["default"](resp)
+
         err_response = body.get("error")
         if err_response is None:
             err_msg = f"Unexpected response {body} missing an error."
             raise RuntimeError(err_msg)
 
-        error = err_map[resp.status].get(
+        error = self._ERR_TABLE[resp.status].get(
             err_response["message"],
-            err_map[resp.status]["default"],
-        )()
+            self._ERR_TABLE[resp.status]["default"],
+        )(resp)
         raise error
 
     @property
@@ -292,10 +658,6 @@ class _MarketstackClient:
             raise RuntimeError(err_msg)
         return self._client_session
 
-    @staticmethod
-    def _format_date(d: date) -> str:
-        return d.strftime("%Y-%m-%d")
-
     @staticmethod
     def _deserialize_eod(raw_eod: RawEod) -> Eod:
         return {
@@ -325,13 +687,27 @@ class HttpMarketstackClient(_MarketstackClient):
     For each marketstack token, you only need one of these.
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self: Self,
         access_key: str,
         plan: MarketstackPlan = MarketstackPlan.BASIC,
+        conn_limit: int = 256,
+        conn_per_host: int = 16,
+        timeout: float = 30,
+        cache: EodCache | None = None,
+        max_concurrent_pages: int = 8,
     ) -> None:
         """Create a HTTP Marketstack Client."""
-        super().__init__(HTTP_BASE_URL, access_key, plan)
+        super().__init__(
+            HTTP_BASE_URL,
+            access_key,
+            plan,
+            conn_limit,
+            conn_per_host,
+            timeout,
+            cache,
+            max_concurrent_pages,
+        )
 
 
 class HttpsMarketstackClient(_MarketstackClient):
@@ -340,14 +716,28 @@ class HttpsMarketstackClient(_MarketstackClient):
     For each marketstack token, you only need one of these.
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self: Self,
         access_key: str,
         plan: MarketstackPlan = MarketstackPlan.BASIC,
+        conn_limit: int = 256,
+        conn_per_host: int = 16,
+        timeout: float = 30,
+        cache: EodCache | None = None,
+        max_concurrent_pages: int = 8,
     ) -> None:
         """Create a HTTPS Marketstack Client."""
         if plan == MarketstackPlan.FREE:
             warnings.warn("Using the free plan isn't likely to work over SSL.",
                           stacklevel=2)
 
-        super().__init__(HTTP_BASE_URL, access_key, plan)
+        super().__init__(
+            HTTP_BASE_URL,
+            access_key,
+            plan,
+            conn_limit,
+            conn_per_host,
+            timeout,
+            cache,
+            max_concurrent_pages,
+        )
@@ -0,0 +1,66 @@
+"""Columnar conversion of EOD data.
+
+Requires numpy, which is an optional dependency of aiomarketstack.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from .types import RawEod
+
+
+def eod_dtype(symbol_length: int = 16, exchange_length: int = 8) -> np.dtype[np.void]:
+    """Create the structured dtype of EOD values with the given string lengths."""
+    return np.dtype([
+        ("open", "f8"),
+        ("high", "f8"),
+        ("low", "f8"),
+        ("close", "f8"),
+        ("volume", "f8"),
+        ("split_factor", "f8"),
+        ("dividend", "f8"),
+        ("symbol", f"U{symbol_length}"),
+        ("exchange", f"U{exchange_length}"),
+        ("date", "datetime64[D]"),
+    ])
+
+
+def to_structured(raw_eods: Iterable[RawEod]) -> npt.NDArray[np.void]:
+    """Convert raw EOD values into a structured array of an ``eod_dtype``.
+
+    The string fields are sized to fit the longest value. Missing prices become
+    ``nan`` and missing strings become empty.
+    """
+    raw_eods = list(raw_eods)
+    symbols = [d["symbol"] or "" for d in raw_eods]
+    exchanges = [d["exchange"] or "" for d in raw_eods]
+    dtype = eod_dtype(
+        max(map(len, symbols), default=1) or 1,
+        max(map(len, exchanges), default=1) or 1,
+    )
+
+    return np.array(
+        [
+            (
+                d["open"],
+                d["high"],
+                d["low"],
+                d["close"],
+                d["volume"],
+                d["split_factor"],
+                d["dividend"],
+                symbol,
+                exchange,
+                # Marketstack dates are always at midnight UTC+0.
+                d["date"][:10],
+            )
+            for d, symbol, exchange in zip(raw_eods, symbols, exchanges)
+        ],
+        dtype=dtype,
+    )
@@ -0,0 +1,147 @@
+"""Persistent caches for historical EOD data."""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Mapping, Optional, Protocol
+from urllib.parse import quote
+
+if TYPE_CHECKING:
+    from os import PathLike
+
+    from typing_extensions import Self
+
+    from .types import RawEod
+
+_CachedDays = Dict[date, Optional["RawEod"]]
+
+
+def _path_component(name: str) -> str:
+    """Escape the given name so it is a single path component within the cache."""
+    # Escapes separators, so the name cannot leave its directory. A leading dot is
+    # escaped too, which rules out "." and "..".
+    escaped = quote(name, safe="")
+    return f"%2E{escaped[1:]}" if escaped.startswith(".") else escaped
+
+
+class EodCache(Protocol):
+    """A store of EOD data for days which will no longer change.
+
+    Each cached day maps to the raw EOD value marketstack returned for it, or to
+    ``None`` if marketstack returned no value for that day (for example, because the
+    market was closed).
+
+    Both methods are synchronous and are called directly on the event loop, so they
+    should be fast; implementations doing slow I/O should keep it to a minimum, e.g.
+    by memoizing what they load.
+    """
+
+    def load(
+        self: Self,
+        exchange: str | None,
+        symbol: str,
+    ) -> Mapping[date, RawEod | None]:
+        """Load all the cached days for the given symbol."""
+        ...
+
+    def store(
+        self: Self,
+        exchange: str | None,
+        symbol: str,
+        eods: Mapping[date, RawEod | None],
+    ) -> None:
+        """Persist the given days for the given symbol."""
+        ...
+
+
+class FileCache:
+    """An EOD cache storing one JSON lines file per exchange and symbol.
+
+    Each line holds a single day, so the files are arranged by time and can be
+    appended to as new ranges are queried.
+
+    The file I/O is blocking. Each file is read at most once per instance, and only
+    newly fetched days are appended to it.
+    """
+
+    def __init__(self: Self, directory: str | PathLike[str]) -> None:
+        """Create a cache rooted at the given directory.
+
+        Args:
+        ----
+            directory: The directory to store the cache files in. Created on demand.
+        """
+        self._directory = Path(directory)
+        self._loaded: dict[tuple[str | None, str], _CachedDays] = {}
+
+    def load(
+        self: Self,
+        exchange: str | None,
+        symbol: str,
+    ) -> Mapping[date, RawEod | None]:
+        """Load all the cached days for the given symbol."""
+        return self._days(exchange, symbol)
+
+    def store(
+        self: Self,
+        exchange: str | None,
+        symbol: str,
+        eods: Mapping[date, RawEod | None],
+    ) -> None:
+        """Persist the given days for the given symbol."""
+        days = self._days(exchange, symbol)
+        new_days = {day: eod for day, eod in eods.items() if day not in days}
+        if not new_days:
+            return
+
+        lines = "".join(
+            json.dumps({"date": day.isoformat(), "eod": eod}) + "\n"
+            for day, eod in sorted(new_days.items())
+        )
+
+        path = self._path(exchange, symbol)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a+b") as f:
+            # Terminate a line left partially written by an interrupted process, so
+            # that it does not corrupt the first new line.
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    lines = "\n" + lines
+            f.write(lines.encode("utf-8"))
+
+        days.update(new_days)
+
+    def _days(self: Self, exchange: str | None, symbol: str) -> _CachedDays:
+        key = (exchange, symbol)
+        if key not in self._loaded:
+            self._loaded[key] = self._read(self._path(exchange, symbol))
+        return self._loaded[key]
+
+    def _path(self: Self, exchange: str | None, symbol: str) -> Path:
+        # Queries without an exchange filter return the symbol's default listing.
+        return (
+            self._directory
+            / (_path_component(exchange) if exchange else "_default")
+            / f"{_path_component(symbol)}.jsonl"
+        )
+
+    @staticmethod
+    def _read(path: Path) -> _CachedDays:
+        if not path.exists():
+            return {}
+
+        days: _CachedDays = {}
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                # Lines left partially written by an interrupted process are
+                # skipped, so that their days are simply queried again.
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                days[date.fromisoformat(entry["date"])] = entry["eod"]
+        return days
@@ -8,6 +8,8 @@ from typing_extensions import Self
 class ResponseError(Exception):
     """A failure response was received from Marketstack."""
 
+    __slots__ = ("response",)
+
     response: ClientResponse
 
     def __init__(self: Self, response: ClientResponse) -> None:
@@ -18,58 +20,88 @@ class ResponseError(Exception):
 class UnhandledResponseError(ResponseError):
     """An unexpected http error code was returned."""
 
+    __slots__ = ()
+
 
 class UnauthorizedError(ResponseError):
     """An unauthorized http response code was returned."""
 
+    __slots__ = ()
+
 
 class InvalidAccessKeyError(UnauthorizedError):
     """An invalid API key was supplied."""
 
+    __slots__ = ()
+
 
 class MissingAccessKeyError(UnauthorizedError):
     """No API Access key was supplied."""
 
+    __slots__ = ()
+
 
 class InactiveUserError(UnauthorizedError):
     """The given user account is inactive."""
 
+    __slots__ = ()
+
 
 class ForbiddenError(ResponseError):
     """The forbidden http response code was returned."""
 
+    __slots__ = ()
+
 
 class HttpsAccessRestrictedError(ForbiddenError):
     """Https is not supported with this plan."""
 
+    __slots__ = ()
+
 
 class FunctionAccessRestrictedError(ForbiddenError):
     """The given API endpoint is not supported on this access plan."""
 
+    __slots__ = ()
+
 
 class NotFoundError(ResponseError):
     """The http not found response was returned."""
 
+    __slots__ = ()
+
 
 class InvalidApiFunctionError(NotFoundError):
     """The given API endpoint does not exist."""
 
+    __slots__ = ()
+
 
 class ResourceNotFoundError(NotFoundError):
     """The resource is not found."""
 
+    __slots__ = ()
+
 
 class TooManyRequestsError(ResponseError):
     """The too many requests http response was returned."""
 
+    __slots__ = ()
+
 
 class UsageLimitReachedError(TooManyRequestsError):
     """The given user account has reached its monthly request volume."""
 
+    __slots__ = ()
+
 
 class RateLimitReachedError(TooManyRequestsError):
     """The given account has reached the rate limit."""
 
+    __slots__ = ()
+
 
 class InternalErrorError(ResponseError):
     """An internal marketstack error has ocurred."""
+
+    __slots__ = ()
@@ -7,7 +7,6 @@ import matplotlib.pyplot as plt
 
 from aiomarketstack import HttpMarketstackClient, MarketstackPlan
 from aiomarketstack.exceptions import ResponseError
-from aiomarketstack.types import Eod
 
 
 async def main() -> None:
@@ -18,17 +17,15 @@ async def main() -> None:
         MarketstackPlan.FREE,
     ) as client:
         try:
-            eod_values: tuple[Eod, ...] = (
-                await client.get_eod_range(("AMZN", ), date_range)
-            )
+            eod_values = await client.get_eod_range_array(("AMZN", ), date_range)
         except ResponseError as resp_err:
             print(f"Uh-oh, a response error ocurred: {resp_err}")
             raise
 
     # Note that there will be missing data (if the market was closed).
-    plt_xaxis = [eod["date"] for eod in eod_values]
+    plt_xaxis = eod_values["date"]
     plt_yaxes = {
-        key: [eod[key] for eod in eod_values]
+        key: eod_values[key]
         for key in ("open", "high", "low", "close")
     }
 
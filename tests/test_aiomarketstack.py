@@ -4,19 +4,31 @@ from __future__ import annotations
 
 import os
 from datetime import date, datetime, timedelta, timezone
-from typing import Literal, Mapping, Sequence, TypedDict
+from typing import TYPE_CHECKING, Literal, Mapping, Sequence, TypedDict, cast
 
 import pytest
 
 from aiomarketstack import (
+    FileCache,
     HttpMarketstackClient,
     HttpsMarketstackClient,
     MarketstackPlan,
 )
-from aiomarketstack.exceptions import UnauthorizedError
+from aiomarketstack.exceptions import (
+    InvalidAccessKeyError,
+    ResponseError,
+    UnauthorizedError,
+)
 
 from .util import busdays
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from aiohttp import ClientResponse
+
+    from aiomarketstack.types import Eod
+
 
 class MarketstackTestFixture(TypedDict):
     """Global test parameters."""
@@ -154,6 +166,147 @@ async def test_range(
         assert busy_days == received_dates
 
 
+@pytest.mark.asyncio()
+async def test_range_paginated(
+    marketstack_test_fixture: MarketstackTestFixture,
+) -> None:
+    """Test get_eod_range for a range spanning multiple pages.
+
+    Marketstack returns at most 1000 values per page, so this range requires the
+    remaining pages to be fetched after the first one.
+    """
+    tickers = ("AMZN", "MSFT", "AAPL")
+    date_range = (date(2022, 1, 1), date(2023, 12, 31))
+    page_size = 1000
+
+    async with HttpMarketstackClient(
+        marketstack_test_fixture["access_token"],
+        plan=MarketstackPlan.FREE,
+    ) as cli:
+        result = await cli.get_eod_range(tickers, date_range)
+        first_page = await cli.get_eod_range(tickers, date_range, max_requests=1)
+
+        busy_days = set(busdays("XNAS", *date_range, inclusive=True))
+        assert len(result) > page_size
+        for ticker in tickers:
+            assert busy_days == {
+                res["date"] for res in result if res["symbol"] == ticker
+            }
+
+        received_pairs = [(res["symbol"], res["date"]) for res in result]
+        assert len(received_pairs) == len(set(received_pairs))
+
+        assert len(first_page) == page_size
+        assert [(res["symbol"], res["date"]) for res in first_page] == \
+            received_pairs[:page_size]
+
+
+@pytest.mark.asyncio()
+async def test_iter_range(
+    marketstack_test_fixture: MarketstackTestFixture,
+) -> None:
+    """Test the iter_eod_range function streams the same data as get_eod_range."""
+    tickers = ("AMZN", )
+    date_range = (date(2023, 2, 1), date(2023, 7, 17))
+
+    async with HttpMarketstackClient(
+        marketstack_test_fixture["access_token"],
+        plan=MarketstackPlan.FREE,
+    ) as cli:
+        received_dates = {
+            res["date"] async for res in cli.iter_eod_range(tickers, date_range)
+        }
+
+        busy_days = set(busdays("XNAS", *date_range, inclusive=True))
+
+        assert busy_days == received_dates
+
+
+@pytest.mark.asyncio()
+async def test_range_array(
+    marketstack_test_fixture: MarketstackTestFixture,
+) -> None:
+    """Test get_eod_range_array returns the same data as get_eod_range."""
+    tickers = ("AMZN", "MSFT")
+    date_range = (date(2023, 2, 1), date(2023, 3, 31))
+
+    async with HttpMarketstackClient(
+        marketstack_test_fixture["access_token"],
+        plan=MarketstackPlan.FREE,
+    ) as cli:
+        eods = await cli.get_eod_range(tickers, date_range)
+        array = await cli.get_eod_range_array(tickers, date_range)
+
+        assert len(eods) == len(array)
+        assert [
+            (eod["symbol"], eod["date"], pytest.approx(eod["close"]))
+            for eod in eods
+        ] == [
+            (row["symbol"], row["date"].item(), row["close"])
+            for row in array
+        ]
+
+
+@pytest.mark.asyncio()
+async def test_batch(
+    marketstack_test_fixture: MarketstackTestFixture,
+) -> None:
+    """Test the get_eod_batch function returns data for every requested pair."""
+    requests = (
+        ("AMZN", date(2023, 7, 17)),
+        ("MSFT", date(2023, 7, 17)),
+        ("AMZN", date(2023, 7, 18)),
+        ("msft", date(2023, 7, 18)),
+    )
+
+    async with HttpMarketstackClient(
+        marketstack_test_fixture["access_token"],
+        plan=MarketstackPlan.FREE,
+    ) as client:
+        results = await client.get_eod_batch(requests)
+
+        assert set(results) == set(requests)
+        assert all([
+            (eod["symbol"], eod["date"]) == (symbol.upper(), target_date)
+            for (symbol, target_date), eod in results.items()
+        ])
+
+
+@pytest.mark.asyncio()
+async def test_range_cached(
+    marketstack_test_fixture: MarketstackTestFixture,
+    tmp_path: Path,
+) -> None:
+    """Test a cached get_eod_range query returns the same data as the uncached one.
+
+    The cached query is made with an invalid access key, so it fails if it issues
+    any request.
+    """
+    tickers = ("AMZN", "MSFT")
+    date_range = (date(2023, 2, 1), date(2023, 3, 31))
+
+    async with HttpMarketstackClient(
+        marketstack_test_fixture["access_token"],
+        plan=MarketstackPlan.FREE,
+        cache=FileCache(tmp_path),
+    ) as cli:
+        uncached = await cli.get_eod_range(tickers, date_range)
+
+    assert len(list(tmp_path.glob("**/*.jsonl"))) == len(tickers)
+
+    async with HttpMarketstackClient(
+        "i-am-a-bad-access-token",
+        plan=MarketstackPlan.FREE,
+        cache=FileCache(tmp_path),
+    ) as cli:
+        cached = await cli.get_eod_range(tickers, date_range)
+
+    def sort_key(eod: Eod) -> tuple[date, str]:
+        return eod["date"], eod["symbol"]
+
+    assert sorted(uncached, key=sort_key) == sorted(cached, key=sort_key)
+
+
 @pytest.mark.asyncio()
 async def test_ssl_free_account_warns(
     marketstack_test_fixture: MarketstackTestFixture,
@@ -180,6 +333,24 @@ async def test_invalid_access_key() -> None:
                 datetime.now(tz=timezone.utc).date() - timedelta(days=1),
             )
 
+def test_invalid_max_concurrent_pages() -> None:
+    """Test that a client which could never fetch a page is rejected."""
+    with pytest.raises(ValueError, match="max_concurrent_pages"):
+        HttpMarketstackClient("i-am-a-bad-access-token", max_concurrent_pages=0)
+
+def test_response_error_slots() -> None:
+    """Test response errors store their response in a slot rather than a dict."""
+    response = cast("ClientResponse", object())
+
+    with pytest.raises(UnauthorizedError) as exc_info:
+        raise InvalidAccessKeyError(response)
+
+    error = exc_info.value
+    assert error.response is response
+    assert isinstance(error, InvalidAccessKeyError)
+    assert isinstance(error, ResponseError)
+    assert error.__dict__ == {}
+
 @pytest.mark.asyncio()
 async def test_uninitialized_gracefully_fails(
     marketstack_test_fixture:
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from datetime import date, timedelta
-from typing import Generator, TypeVar
+from typing import TypeVar
 
 import numpy as np
 
@@ -12,7 +12,7 @@ V = TypeVar("V")
 T = TypeVar("T")
 
 _HOLIDAYS = {
-    "NYSE": {
+    "NYSE": frozenset({
         date(2020, 1, 1),
         date(2020, 1, 20),
         date(2020, 2, 17),
@@ -50,8 +50,8 @@ _HOLIDAYS = {
         date(2023, 9, 4),
         date(2023, 11, 23),
         date(2023, 12, 25),
-    },
-    "XNAS": {
+    }),
+    "XNAS": frozenset({
         # 2022
         date(2022, 1, 17),
         date(2022, 2, 21),
@@ -89,7 +89,13 @@ _HOLIDAYS = {
         date(2024, 11, 28),
         date(2024, 11, 29),
         date(2024, 12, 25),
-    },
+    }),
+}
+
+
+_HOLIDAYS_NP = {
+    exchange: np.array(sorted(holidays), dtype="datetime64[D]")
+    for exchange, holidays in _HOLIDAYS.items()
 }
 
 
@@ -116,9 +122,9 @@ def busday_count(
     """
     end_date = date_to + timedelta(days=1) if inclusive else date_to
 
-    holiday_count = len([h for h in _HOLIDAYS[exchange] if date_from <= h < end_date])
-
-    return int(np.busday_count(date_from, end_date)) - holiday_count
+    return int(
+        np.busday_count(date_from, end_date, holidays=_HOLIDAYS_NP[exchange]),
+    )
 
 
 def busdays(
@@ -126,8 +132,8 @@ def busdays(
     date_from: date,
     date_to: date,
     inclusive: bool = False,
-) -> Generator[date, None, None]:
-    """Create a generator of days for which the given market is open.
+) -> list[date]:
+    """Create a list of days for which the given market is open.
 
     Args:
     ----
@@ -137,7 +143,10 @@ def busdays(
         inclusive: Whether the last date is to be included.
     """
     end_date = date_to + timedelta(days=1) if inclusive else date_to
-    count = (end_date - date_from).days
-    all_date_gen = (date_from + timedelta(days=n) for n in range(count))
+    all_days = np.arange(
+        np.datetime64(date_from), np.datetime64(end_date), dtype="datetime64[D]",
+    )
+    mask = np.is_busday(all_days, holidays=_HOLIDAYS_NP[exchange])
 
-    return (d for d in all_date_gen if is_market_open(exchange, d))
+    open_days: list[date] = all_days[mask].tolist()
+    return open_days